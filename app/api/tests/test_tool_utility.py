@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import patch, MagicMock, mock_open
 from app.services.tool_registry import BaseTool, ToolInput, ToolFile
 from fastapi import HTTPException
+from app.api.error_utilities import InputValidationError
 from app.api.tool_utilities import get_executor_by_name, load_tool_metadata, prepare_input_data, execute_tool
 
 # Sample configuration for tools_config
@@ -100,4 +101,15 @@ def test_execute_tool_failure(mock_get_executor):
     with pytest.raises(HTTPException) as exc_info:
         execute_tool(tool_id, request_inputs_dict)
     assert exc_info.value.status_code == 500
-    assert "Function not found" in str(exc_info.value.detail)
\ No newline at end of file
+    assert "Function not found" in str(exc_info.value.detail)
+
+@patch('app.api.tool_utilities.get_executor_by_name')
+def test_execute_tool_input_validation_error(mock_get_executor):
+    tool_id = "0"
+    request_inputs_dict = {"topic": "Math", "n_questions": 11}
+    mock_get_executor.return_value = MagicMock(side_effect=InputValidationError("Invalid quizzify arguments"))
+
+    # Passed through unchanged so the router responds with a 400 instead of a 500
+    with pytest.raises(InputValidationError) as exc_info:
+        execute_tool(tool_id, request_inputs_dict)
+    assert exc_info.value.message == "Invalid quizzify arguments"
@@ -144,6 +144,10 @@ def execute_tool(tool_id, request_inputs_dict):
         
         return execute_function(**request_inputs_dict)
     
+    except InputValidationError:
+        # Executors validate their own arguments; let the router answer these with a 400
+        raise
+    
     except VideoTranscriptError as e:
         logger.error(f"Failed to execute tool due to video transcript error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,8 +1,9 @@
 from app.features.quizzify.document_loaders import get_docs
 from app.services.logger import setup_logger
 from app.features.quizzify.tools import QuizBuilder
-from app.api.error_utilities import LoaderError, ToolExecutorError
+from app.api.error_utilities import InputValidationError, LoaderError, ToolExecutorError
 from app.services.schemas import QuizzifyArgs
+from pydantic import ValidationError
 
 logger = setup_logger()
 
@@ -13,14 +14,27 @@ def executor(topic: str,
              lang: str,
              verbose=True):
     
+    # Validate and coerce the arguments once, before any document loading
+    try:
+        args = QuizzifyArgs(
+            topic=topic,
+            n_questions=n_questions,
+            file_url=file_url,
+            file_type=file_type,
+            lang=lang
+        )
+    except ValidationError as e:
+        logger.error(f"Invalid quizzify arguments: {e}")
+        raise InputValidationError(f"Invalid quizzify arguments: {e}") from e
+
     try:
         if verbose:
-            logger.info(f"File URL loaded: {file_url}")
+            logger.info(f"File URL loaded: {args.file_url}")
 
-        docs = get_docs(file_url, file_type, lang, verbose=True)
+        docs = get_docs(args.file_url, args.file_type, args.lang, verbose=True)
 
     
-        output = QuizBuilder(topic, lang, verbose=verbose).create_questions(docs, n_questions)
+        output = QuizBuilder(args.topic, args.lang, verbose=verbose).create_questions(docs, args.n_questions)
     
     except LoaderError as e:
         error_message = e
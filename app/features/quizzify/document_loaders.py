@@ -1,6 +1,5 @@
 from langchain_community.document_loaders import YoutubeLoader, PyPDFLoader, TextLoader, UnstructuredURLLoader, UnstructuredPowerPointLoader, Docx2txtLoader, UnstructuredExcelLoader, UnstructuredXMLLoader
 from langchain_community.document_loaders.csv_loader import CSVLoader
-from langchain_google_genai import ChatGoogleGenerativeAI
 from app.utils.allowed_file_extensions import FileType
 from app.api.error_utilities import FileHandlerError, ImageHandlerError
 from app.api.error_utilities import VideoTranscriptError
@@ -18,6 +17,7 @@ import tempfile
 import uuid
 import requests
 import gdown
+from functools import lru_cache
 import shutil
 import io
 import os
@@ -393,7 +393,11 @@ def load_docs_youtube_url(youtube_url: str, verbose=True) -> str:
 
     return split_docs
 
-llm_for_img = ChatGoogleGenerativeAI(model="gemini-1.5-flash")
+@lru_cache(maxsize=1)
+def get_llm_for_img():
+    # Imported and built on first use, so loading this module does not pull in the GenAI client
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model="gemini-1.5-flash")
 
 def generate_docs_from_img(img_url, verbose: bool=False):
     message = HumanMessage(
@@ -407,7 +411,7 @@ def generate_docs_from_img(img_url, verbose: bool=False):
     )
 
     try:
-        response = llm_for_img.invoke([message]).content
+        response = get_llm_for_img().invoke([message]).content
         logger.info(f"Generated summary: {response}")
         docs = Document(page_content=response, metadata={"source": img_url})
         split_docs = splitter.split_documents([docs])
@@ -1,6 +1,6 @@
 import pytest
 from app.features.quizzify.core import executor
-# from app.api.error_utilities import SyllabusGeneratorError
+from app.api.error_utilities import InputValidationError
 from app.services.schemas import QuizzifyArgs
 
 def test_executor_pdf_url_valid():
@@ -391,4 +391,14 @@ def test_executor_gmp3_url_invalid():
     with pytest.raises(ValueError) as exc_info:
         quiz = executor(quizzify_args)
 
-    assert isinstance(exc_info.value, ValueError)
\ No newline at end of file
+    assert isinstance(exc_info.value, ValueError)
+
+def test_executor_too_many_questions():
+    with pytest.raises(InputValidationError):
+        executor(
+            topic = "college",
+            n_questions = 11,
+            file_url = "https://filesamples.com/samples/document/pdf/sample1.pdf",
+            file_type = "pdf",
+            lang = "en"
+        )
@@ -0,0 +1,174 @@
+import json
+import pytest
+import tenacity
+from google.api_core.exceptions import ResourceExhausted
+from langchain_core.documents import Document
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake import FakeListLLM, FakeStreamingListLLM
+from langchain_core.pydantic_v1 import ValidationError
+from app.features.quizzify import tools
+from app.features.quizzify.tools import QuizBuilder, QuizQuestion
+
+CHOICES = [
+    {"key": "A", "value": "Berlin"},
+    {"key": "B", "value": "Madrid"},
+    {"key": "C", "value": "Paris"},
+    {"key": "D", "value": "Rome"}
+]
+
+VALID_QUESTION = {
+    "question": "What is the capital of France?",
+    "choices": CHOICES,
+    "answer": "C",
+    "explanation": "Paris is the capital of France."
+}
+
+@pytest.fixture(autouse=True)
+def shared_vectorstores(monkeypatch):
+    monkeypatch.setattr(tools, "shared_vectorstores", {})
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    embedded_texts: list = []
+
+    def embed_documents(self, texts):
+        self.embedded_texts.extend(texts)
+        return super().embed_documents(texts)
+
+class RateLimitedLLM(FakeListLLM):
+    """Raises a 429 for the first `failures` calls, then answers from `responses`."""
+    failures: int
+    calls: list = []
+
+    def _call(self, *args, **kwargs):
+        self.calls.append(1)
+        if len(self.calls) <= self.failures:
+            raise ResourceExhausted("Quota exceeded")
+        return super()._call(*args, **kwargs)
+
+@pytest.fixture
+def retry_sleeps(monkeypatch):
+    # Skip the backoff between tenacity attempts and record it instead
+    sleeps = []
+    monkeypatch.setattr(tenacity.nap.time, "sleep", sleeps.append)
+    return sleeps
+
+def build_quiz_builder(responses, model=None):
+    return QuizBuilder(
+        "geography",
+        prompt="{format_instructions}\n{context}\n{attribute_collection}",
+        model=model or FakeStreamingListLLM(responses=responses),
+        embedding_model=DeterministicFakeEmbedding(size=16)
+    )
+
+def test_quiz_question_valid():
+    quiz_question = QuizQuestion(**VALID_QUESTION)
+
+    assert quiz_question.answer == "C"
+    assert [choice.key for choice in quiz_question.choices] == ["A", "B", "C", "D"]
+
+def test_quiz_question_duplicate_choice_keys():
+    choices = CHOICES[:3] + [{"key": "A", "value": "Rome"}]
+
+    with pytest.raises(ValidationError):
+        QuizQuestion(**{**VALID_QUESTION, "choices": choices})
+
+def test_quiz_question_answer_not_in_choices():
+    with pytest.raises(ValidationError):
+        QuizQuestion(**{**VALID_QUESTION, "answer": "E"})
+
+def test_create_questions_skips_invalid_question():
+    invalid_question = {**VALID_QUESTION, "answer": "E"}
+    unused_question = {**VALID_QUESTION, "question": "What is the capital of Spain?", "answer": "B"}
+    builder = build_quiz_builder([json.dumps(question) for question in (invalid_question, VALID_QUESTION, unused_question)])
+    documents = [Document(page_content="Paris is the capital of France.")]
+
+    questions = builder.create_questions(documents, 1)
+
+    assert questions == [{
+        "question": VALID_QUESTION["question"],
+        "choices": CHOICES,
+        "answer": "C",
+        "explanation": VALID_QUESTION["explanation"]
+    }]
+    # The invalid question used up the first of two attempts
+    assert builder.model.i == 2
+
+def test_stream_question_rejects_malformed_stream():
+    malformed_question = {**VALID_QUESTION, "choices": "A, B, C or D"}
+    builder = build_quiz_builder([json.dumps(malformed_question)])
+    chain = builder.compile([Document(page_content="Paris is the capital of France.")])
+
+    assert builder.stream_question(chain, "Topic: geography, Lang: en") is None
+
+def test_create_questions_raises_persistent_api_error(retry_sleeps):
+    model = RateLimitedLLM(responses=[json.dumps(VALID_QUESTION)], failures=10**6)
+    builder = build_quiz_builder(None, model=model)
+    documents = [Document(page_content="Paris is the capital of France.")]
+
+    with pytest.raises(ResourceExhausted):
+        builder.create_questions(documents, 3)
+
+    # Each of the three concurrent requests is retried by tenacity only, not by the question loop
+    assert len(model.calls) == 3 * tools.LLM_MAX_ATTEMPTS
+
+def test_generate_question_retries_transient_api_error(retry_sleeps):
+    model = RateLimitedLLM(responses=[json.dumps(VALID_QUESTION)], failures=2)
+    builder = build_quiz_builder(None, model=model)
+    chain = builder.compile([Document(page_content="Paris is the capital of France.")])
+
+    assert builder.generate_question(chain, "Topic: geography, Lang: en") == VALID_QUESTION
+    assert len(model.calls) == 3
+    assert len(retry_sleeps) == 2
+
+def test_generate_question_reraises_after_max_attempts(retry_sleeps):
+    model = RateLimitedLLM(responses=[json.dumps(VALID_QUESTION)], failures=10**6)
+    builder = build_quiz_builder(None, model=model)
+    chain = builder.compile([Document(page_content="Paris is the capital of France.")])
+
+    with pytest.raises(ResourceExhausted):
+        builder.generate_question(chain, "Topic: geography, Lang: en")
+
+    assert len(model.calls) == tools.LLM_MAX_ATTEMPTS
+    assert len(retry_sleeps) == tools.LLM_MAX_ATTEMPTS - 1
+
+def test_quiz_builder_rejects_vectorstore_without_id_filtering():
+    with pytest.raises(ValueError):
+        QuizBuilder(
+            "geography",
+            "en",
+            InMemoryVectorStore,
+            model=FakeStreamingListLLM(responses=[json.dumps(VALID_QUESTION)]),
+            embedding_model=DeterministicFakeEmbedding(size=16)
+        )
+
+def test_quiz_builders_share_embedded_chunks():
+    embedding_model = CountingEmbeddings(size=16)
+    france = [Document(page_content="Paris is the capital of France."), Document(page_content="France borders Spain.")]
+    spain = [Document(page_content="Madrid is the capital of Spain."), Document(page_content="France borders Spain.")]
+
+    first = QuizBuilder("geography", embedding_model=embedding_model, model=FakeStreamingListLLM(responses=["{}"]))
+    first.compile(france)
+    second = QuizBuilder("geography", embedding_model=embedding_model, model=FakeStreamingListLLM(responses=["{}"]))
+    second.compile(spain)
+
+    # The chunk shared by both requests is embedded only once, in the same store
+    assert embedding_model.embedded_texts == [
+        "Paris is the capital of France.",
+        "France borders Spain.",
+        "Madrid is the capital of Spain."
+    ]
+    assert second.vectorstore is first.vectorstore
+
+    # Each builder retrieves only the chunks of its own request
+    query = "Topic: geography, Lang: en"
+    assert {doc.page_content for doc in first.retrieve(query)} == {doc.page_content for doc in france}
+    assert {doc.page_content for doc in second.retrieve(query)} == {doc.page_content for doc in spain}
+
+def test_quiz_builder_rejects_more_chunks_than_the_store_holds(monkeypatch):
+    monkeypatch.setattr(tools, "SHARED_VECTORSTORE_MAX_SIZE", 2)
+    builder = build_quiz_builder([json.dumps(VALID_QUESTION)])
+    documents = [Document(page_content=f"Fact {i}.") for i in range(3)]
+
+    with pytest.raises(ValueError):
+        builder.compile(documents)
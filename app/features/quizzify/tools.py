@@ -1,21 +1,68 @@
 from typing import List, Dict
+from contextlib import closing
+from functools import lru_cache
+import hashlib
+import inspect
 import os
+import re
 
+from google.api_core.exceptions import GoogleAPIError
 from langchain_core.documents import Document
-from langchain_chroma import Chroma
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnablePassthrough, RunnableParallel
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough, RunnableParallel
+from langchain_core.exceptions import OutputParserException
 from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.pydantic_v1 import BaseModel, Field
-from langchain_google_genai import GoogleGenerativeAI
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from langchain_core.pydantic_v1 import BaseModel, Field, ValidationError, root_validator, validator
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 
+from app.services.prompts import build_prompt_template, get_format_instructions
+from app.services.vectorstore import QuantizedVectorStore
 from app.services.logger import setup_logger
 
 relative_path = "features/quzzify"
 
 logger = setup_logger(__name__)
 
+# Maximum number of texts per embedding API request
+EMBEDDING_BATCH_SIZE = 100
+
+# Number of chunks passed as context, and MMR candidates they are picked from
+RETRIEVER_K = 4
+RETRIEVER_FETCH_K = 20
+
+# Expected types of the top-level QuizQuestion fields, checked while the response streams in
+QUESTION_FIELD_TYPES = {"question": str, "choices": list, "answer": str, "explanation": str}
+
+# Retries of a single LLM call on transient API errors (e.g. 429), with jittered exponential backoff in seconds.
+# generate_question is the only retry layer: the default model makes a single attempt per call (max_retries=1),
+# models passed in should disable their own retries the same way, and create_questions re-raises once it gives up.
+# This bounds a persistent error to LLM_MAX_ATTEMPTS calls and roughly 35 seconds of backoff per request
+LLM_MAX_ATTEMPTS = 6
+LLM_BACKOFF_INITIAL = 1
+LLM_BACKOFF_MAX = 30
+LLM_RETRY_ERRORS = (GoogleAPIError, TimeoutError)
+
+# Bounds of the shared vectorstore: chunks kept at most, and seconds an unused chunk is kept
+SHARED_VECTORSTORE_MAX_SIZE = 50000
+SHARED_VECTORSTORE_TTL = 60 * 60
+
+# Variables filled in the prompt template on every request
+PROMPT_INPUT_VARIABLES = ("attribute_collection",)
+
+# Vectorstores shared across QuizBuilder instances, keyed by (vectorstore class, collection name)
+shared_vectorstores = {}
+
+def supports_id_filtering(vectorstore_class) -> bool:
+    # Retrieval must be restricted to the chunks of the current request in the shared store
+    search = getattr(vectorstore_class, "max_marginal_relevance_search_by_vector", None)
+    return search is not None and "ids" in inspect.signature(search).parameters
+
+def get_collection_name(embedding_model_name: str) -> str:
+    return "quizzify-" + re.sub(r"[^a-zA-Z0-9._-]", "-", embedding_model_name)
+
+def get_document_id(document: Document, embedding_model_name: str) -> str:
+    # Content hash of the chunk, so identical chunks are embedded only once per embedding model
+    return hashlib.sha256(f"{embedding_model_name}:{document.page_content}".encode("utf-8")).hexdigest()
+
 def transform_json_dict(input_data: dict) -> dict:
     # Validate and parse the input data to ensure it matches the QuizQuestion schema
     quiz_question = QuizQuestion(**input_data)
@@ -43,44 +90,45 @@ def read_text_file(file_path):
     with open(absolute_file_path, 'r') as file:
         return file.read()
 
+@lru_cache(maxsize=1)
+def get_default_prompt() -> str:
+    return read_text_file("prompt/quizzify-prompt.txt")
+
 class QuizBuilder:
-    def __init__(self, topic, lang='en', vectorstore_class=Chroma, prompt=None, embedding_model=None, model=None, parser=None, verbose=False):
-        default_config = {
-            "model": GoogleGenerativeAI(model="gemini-1.0-pro"),
-            "embedding_model": GoogleGenerativeAIEmbeddings(model='models/embedding-001'),
-            "parser": JsonOutputParser(pydantic_object=QuizQuestion),
-            "prompt": read_text_file("prompt/quizzify-prompt.txt"),
-            "vectorstore_class": Chroma
-        }
-        
-        self.prompt = prompt or default_config["prompt"]
-        self.model = model or default_config["model"]
-        self.parser = parser or default_config["parser"]
-        self.embedding_model = embedding_model or default_config["embedding_model"]
+    def __init__(self, topic, lang='en', vectorstore_class=None, prompt=None, embedding_model=None, model=None, parser=None, verbose=False):
+        if topic is None: raise ValueError("Topic must be provided")
+
+        self.vectorstore_class = vectorstore_class or QuantizedVectorStore
+        if not supports_id_filtering(self.vectorstore_class):
+            raise ValueError(
+                f"{self.vectorstore_class.__name__} cannot restrict max_marginal_relevance_search_by_vector to ids"
+            )
+
+        # Imported here so loading this module stays cheap; defaults are only built when not provided
+        from langchain_google_genai import GoogleGenerativeAI
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+        self.prompt = prompt or get_default_prompt()
+        self.model = model or GoogleGenerativeAI(model="gemini-1.0-pro", max_retries=1)
+        self.parser = parser or JsonOutputParser(pydantic_object=QuizQuestion)
+        self.embedding_model = embedding_model or GoogleGenerativeAIEmbeddings(model='models/embedding-001')
         
-        self.vectorstore_class = vectorstore_class or default_config["vectorstore_class"]
         self.vectorstore, self.retriever, self.runner = None, None, None
+        self.doc_ids, self.query_embeddings = [], {}
         self.topic = topic
         self.lang = lang
         self.verbose = verbose
-        
-        if vectorstore_class is None: raise ValueError("Vectorstore must be provided")
-        if topic is None: raise ValueError("Topic must be provided")
     
     def compile(self, documents: List[Document]):
         # Return the chain
-        prompt = PromptTemplate(
-            template=self.prompt,
-            input_variables=["attribute_collection"],
-            partial_variables={"format_instructions": self.parser.get_format_instructions()}
-        )
+        prompt = build_prompt_template(self.prompt, PROMPT_INPUT_VARIABLES, get_format_instructions(self.parser))
 
         if self.runner is None:
-            logger.info(f"Creating vectorstore from {len(documents)} documents") if self.verbose else None
-            self.vectorstore = self.vectorstore_class.from_documents(documents, self.embedding_model)
-            logger.info(f"Vectorstore created") if self.verbose else None
+            self.vectorstore = self.get_vectorstore()
+            self.doc_ids = self.add_documents(documents)
+            logger.info(f"Vectorstore ready") if self.verbose else None
 
-            self.retriever = self.vectorstore.as_retriever()
+            self.retriever = RunnableLambda(self.retrieve)
             logger.info(f"Retriever created successfully") if self.verbose else None
 
             self.runner = RunnableParallel(
@@ -95,22 +143,109 @@ class QuizBuilder:
         
         return chain
 
+    def get_query_embedding(self, query: str) -> List[float]:
+        # Every attempt sends the same query, so embed it only once
+        if query not in self.query_embeddings:
+            self.query_embeddings[query] = self.embedding_model.embed_query(query)
+        return self.query_embeddings[query]
+
+    def retrieve(self, query: str) -> List[Document]:
+        # Only retrieve from the chunks of this request
+        return self.vectorstore.max_marginal_relevance_search_by_vector(
+            self.get_query_embedding(query),
+            k=RETRIEVER_K,
+            fetch_k=RETRIEVER_FETCH_K,
+            ids=self.doc_ids
+        )
+
+    @property
+    def embedding_model_name(self) -> str:
+        return getattr(self.embedding_model, "model", type(self.embedding_model).__name__)
+
+    def get_vectorstore(self):
+        collection_name = get_collection_name(self.embedding_model_name)
+        key = (self.vectorstore_class, collection_name)
+
+        if key not in shared_vectorstores:
+            logger.info(f"Creating vectorstore collection {collection_name}") if self.verbose else None
+            # Only QuantizedVectorStore knows how to bound its size
+            bounds = (
+                {"max_size": SHARED_VECTORSTORE_MAX_SIZE, "ttl": SHARED_VECTORSTORE_TTL}
+                if issubclass(self.vectorstore_class, QuantizedVectorStore) else {}
+            )
+            shared_vectorstores[key] = self.vectorstore_class(
+                collection_name=collection_name,
+                embedding_function=self.embedding_model,
+                **bounds
+            )
+
+        return shared_vectorstores[key]
+
+    def add_documents(self, documents: List[Document]) -> List[str]:
+        # Deduplicate chunks by content hash, preserving order
+        documents_by_id = {}
+        for doc in documents:
+            documents_by_id.setdefault(get_document_id(doc, self.embedding_model_name), doc)
+        doc_ids = list(documents_by_id)
+
+        # Inserting more chunks than the store holds would evict this request's own earlier batches
+        max_size = getattr(self.vectorstore, "max_size", None)
+        if max_size is not None and len(doc_ids) > max_size:
+            raise ValueError(f"Documents have {len(doc_ids)} chunks, more than the {max_size} the vectorstore can hold")
+
+        existing_ids = {doc.id for doc in self.vectorstore.get_by_ids(doc_ids)}
+        missing_ids = [doc_id for doc_id in doc_ids if doc_id not in existing_ids]
+
+        if self.verbose:
+            logger.info(f"Found {len(existing_ids)} of {len(doc_ids)} document chunks already embedded")
+
+        # Each add_documents call embeds its chunks with a single embedding request
+        for start in range(0, len(missing_ids), EMBEDDING_BATCH_SIZE):
+            batch_ids = missing_ids[start:start + EMBEDDING_BATCH_SIZE]
+            self.vectorstore.add_documents([documents_by_id[doc_id] for doc_id in batch_ids], ids=batch_ids)
+
+        if missing_ids and self.verbose:
+            logger.info(f"Embedded {len(missing_ids)} new document chunks")
+
+        return doc_ids
+
     def validate_response(self, response: Dict) -> bool:
-        try:
-            # Assuming the response is already a dictionary
-            if isinstance(response, dict):
-                if 'question' in response and 'choices' in response and 'answer' in response and 'explanation' in response:
-                    choices = response['choices']
-                    if isinstance(choices, dict):
-                        for key, value in choices.items():
-                            if not isinstance(key, str) or not isinstance(value, str):
-                                return False
-                        return True
-            return False
-        except TypeError as e:
-            if self.verbose:
-                logger.error(f"TypeError during response validation: {e}")
-            return False
+        # Field types and choices are checked by QuizQuestion in transform_json_dict,
+        # so only the shape of the transformed response is checked here
+        return (
+            isinstance(response, dict)
+            and isinstance(response.get("choices"), dict)
+            and all(key in response for key in ("question", "answer", "explanation"))
+        )
+
+    def validate_partial_response(self, partial) -> bool:
+        # A field can still be incomplete, but once it appears its type is final
+        return isinstance(partial, dict) and all(
+            isinstance(partial[field], field_type)
+            for field, field_type in QUESTION_FIELD_TYPES.items()
+            if field in partial
+        )
+
+    def generate_question(self, chain, query: str):
+        retryer = Retrying(
+            retry=retry_if_exception_type(LLM_RETRY_ERRORS),
+            stop=stop_after_attempt(LLM_MAX_ATTEMPTS),
+            wait=wait_exponential_jitter(initial=LLM_BACKOFF_INITIAL, max=LLM_BACKOFF_MAX),
+            reraise=True
+        )
+        return retryer(self.stream_question, chain, query)
+
+    def stream_question(self, chain, query: str):
+        response = None
+        # The parser yields partial dicts while the LLM is still generating
+        with closing(chain.stream(query)) as stream:
+            for partial in stream:
+                if not self.validate_partial_response(partial):
+                    # Closing the stream on exit stops the LLM generation early
+                    logger.warning(f"Aborting malformed response stream: {partial}") if self.verbose else None
+                    return None
+                response = partial
+        return response
 
     def format_choices(self, choices: Dict[str, str]) -> List[Dict[str, str]]:
         return [{"key": k, "value": v} for k, v in choices.items()]
@@ -118,42 +253,64 @@ class QuizBuilder:
     def create_questions(self, documents: List[Document], num_questions: int = 5) -> List[Dict]:
         if self.verbose: logger.info(f"Creating {num_questions} questions")
         
-        if num_questions > 10:
-            return {"message": "error", "data": "Number of questions cannot exceed 10"}
-        
         chain = self.compile(documents)
         
         generated_questions = []
         attempts = 0
         max_attempts = num_questions * 5  # Allow for more attempts to generate questions
 
+        query = f"Topic: {self.topic}, Lang: {self.lang}"
+        self.get_query_embedding(query)
+
         while len(generated_questions) < num_questions and attempts < max_attempts:
-            response = chain.invoke(f"Topic: {self.topic}, Lang: {self.lang}")
-            if self.verbose:
-                logger.info(f"Generated response attempt {attempts + 1}: {response}")
-
-            response = transform_json_dict(response)
-            # Directly check if the response format is valid
-            if self.validate_response(response):
-                response["choices"] = self.format_choices(response["choices"])
-                generated_questions.append(response)
-                if self.verbose:
-                    logger.info(f"Valid question added: {response}")
-                    logger.info(f"Total generated questions: {len(generated_questions)}")
-            else:
+            # Request all missing questions concurrently instead of one LLM round trip at a time
+            batch_size = min(num_questions - len(generated_questions), max_attempts - attempts)
+            responses = RunnableLambda(lambda q: self.generate_question(chain, q)).batch(
+                [query] * batch_size,
+                return_exceptions=True
+            )
+
+            for response in responses:
+                # API errors were already retried by generate_question, so fail the request instead of
+                # spending more attempts on them; only unusable responses use up an attempt
+                if isinstance(response, Exception) and not isinstance(response, OutputParserException):
+                    logger.error(f"Failed to generate question: {response}")
+                    raise response
+
+                attempts += 1
+
+                if isinstance(response, OutputParserException):
+                    logger.warning(f"Unparsable response. Attempt {attempts} of {max_attempts}: {response}") if self.verbose else None
+                    continue
+
+                if response is None:
+                    logger.warning(f"Malformed response aborted. Attempt {attempts} of {max_attempts}") if self.verbose else None
+                    continue
+
                 if self.verbose:
-                    logger.warning(f"Invalid response format. Attempt {attempts + 1} of {max_attempts}")
-            
-            # Move to the next attempt regardless of success to ensure progress
-            attempts += 1
+                    logger.info(f"Generated response attempt {attempts}: {response}")
+
+                try:
+                    response = transform_json_dict(response)
+                except (ValidationError, TypeError) as e:
+                    logger.warning(f"Invalid question. Attempt {attempts} of {max_attempts}: {e}") if self.verbose else None
+                    continue
+
+                # Directly check if the response format is valid
+                if len(generated_questions) < num_questions and self.validate_response(response):
+                    response["choices"] = self.format_choices(response["choices"])
+                    generated_questions.append(response)
+                    if self.verbose:
+                        logger.info(f"Valid question added: {response}")
+                        logger.info(f"Total generated questions: {len(generated_questions)}")
+                else:
+                    if self.verbose:
+                        logger.warning(f"Invalid response format. Attempt {attempts} of {max_attempts}")
 
         # Log if fewer questions are generated
         if len(generated_questions) < num_questions:
             logger.warning(f"Only generated {len(generated_questions)} out of {num_questions} requested questions")
         
-        if self.verbose: logger.info(f"Deleting vectorstore")
-        self.vectorstore.delete_collection()
-        
         # Return the list of questions
         return generated_questions[:num_questions]
 
@@ -166,6 +323,19 @@ class QuizQuestion(BaseModel):
     answer: str = Field(description="The key of the correct answer from the choices list")
     explanation: str = Field(description="An explanation of why the answer is correct")
 
+    @validator("choices")
+    def check_unique_choice_keys(cls, choices):
+        keys = [choice.key for choice in choices]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Choice keys must be unique")
+        return choices
+
+    @root_validator(skip_on_failure=True)
+    def check_answer_in_choices(cls, values):
+        if values["answer"] not in {choice.key for choice in values["choices"]}:
+            raise ValueError("Answer must be the key of one of the choices")
+        return values
+
     model_config = {
         "json_schema_extra": {
             "examples": """ 
@@ -1,12 +1,67 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from typing import Any, Dict, List
 from app.services.logger import setup_logger
-from app.features.syllabus_generator.tools import SyllabusRequestArgs
-from app.features.syllabus_generator.tools import generate_syllabus
-from app.features.syllabus_generator.document_loaders import generate_summary_from_img, summarize_transcript_youtube_url, get_summary
 from app.api.error_utilities import SyllabusGeneratorError
 from app.services.schemas import SyllabusGeneratorArgsModel
 
 logger = setup_logger()
 
+SUMMARY_CACHE_DIR = os.path.join(tempfile.gettempdir(), "syllabus_summaries")
+SUMMARY_CACHE_SIZE_LIMIT = 2**30  # 1 GiB
+SUMMARY_CACHE_EXPIRE = 7 * 24 * 60 * 60  # One week, in seconds
+
+# Google Drive documents are edited in place behind the same URL, so their summaries are never cached
+LIVE_FILE_TYPES = {"gdoc", "gsheet", "gslide", "gpdf"}
+
+@lru_cache(maxsize=1)
+def get_summary_cache():
+    from diskcache import Cache
+    return Cache(SUMMARY_CACHE_DIR, size_limit=SUMMARY_CACHE_SIZE_LIMIT)
+
+def get_cached_file_summary(file_url: str, file_type: str, lang: str, verbose: bool = True) -> str:
+    # Summarizing means downloading the file and an LLM call, so reuse summaries of files seen before
+    if file_type in LIVE_FILE_TYPES:
+        return get_file_summary(file_url, file_type, verbose)
+
+    key = hashlib.sha256(f"{file_url}|{file_type}|{lang}".encode("utf-8")).hexdigest()
+
+    # The cache only saves work, so a broken cache directory must not fail the request
+    try:
+        cache = get_summary_cache()
+        summary = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Summary cache unavailable, summarizing {file_url} directly: {e}")
+        return get_file_summary(file_url, file_type, verbose)
+
+    if summary is not None:
+        logger.info(f"Summary cache hit for {file_url}") if verbose else None
+        return summary
+
+    summary = get_file_summary(file_url, file_type, verbose)
+    if summary:
+        try:
+            cache.set(key, summary, expire=SUMMARY_CACHE_EXPIRE)
+        except Exception as e:
+            logger.warning(f"Failed to cache summary of {file_url}: {e}")
+
+    return summary
+
+def get_file_summary(file_url: str, file_type: str, verbose: bool = True) -> str:
+    # The loaders and LLM pipeline pull in the LangChain integrations, so import them on first use
+    if file_type == 'img':
+        from app.features.syllabus_generator.document_loaders import generate_summary_from_img
+        return generate_summary_from_img(file_url)
+    elif file_type == 'youtube_url':
+        from app.features.syllabus_generator.document_loaders import summarize_transcript_youtube_url
+        return summarize_transcript_youtube_url(file_url, verbose=verbose)
+    else:
+        from app.features.syllabus_generator.document_loaders import get_summary
+        return get_summary(file_url, file_type, verbose=verbose)
+
 def executor(grade_level: str,
              course: str,
              instructor_name: str,
@@ -25,14 +80,7 @@ def executor(grade_level: str,
         logger.info(f"File URL loaded: {file_url}")
     
     try:
-        
-        if file_type == 'img':
-            summary = generate_summary_from_img(file_url)
-        elif file_type == 'youtube_url':
-            summary = summarize_transcript_youtube_url(file_url, verbose=verbose)
-        else:
-            summary = get_summary(file_url, file_type, verbose=verbose)
-    
+        # Validate the arguments before summarizing the file so bad input fails fast
         syllabus_args_model = SyllabusGeneratorArgsModel(
             grade_level = grade_level,
             course = course,
@@ -48,6 +96,10 @@ def executor(grade_level: str,
             lang = lang
         )
 
+        summary = get_cached_file_summary(file_url, file_type, lang, verbose=verbose)
+
+        from app.features.syllabus_generator.tools import SyllabusRequestArgs, generate_syllabus
+
         request_args = SyllabusRequestArgs(
                                 syllabus_args_model,
                                 summary)
@@ -59,3 +111,18 @@ def executor(grade_level: str,
         raise SyllabusGeneratorError(f"Failed to generate syllabus: {str(e)}") from e
 
     return syllabus
+
+async def executor_async(**request_kwargs):
+    """Runs executor in a worker thread, since the document loaders and the LLM call are blocking."""
+    return await asyncio.to_thread(executor, **request_kwargs)
+
+async def batch_executor_async(requests: List[Dict[str, Any]], max_concurrency: int = 8) -> list:
+    """Generates one syllabus per request dict, at most max_concurrency at a time. Await it from the running event loop."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(request_kwargs: Dict[str, Any]):
+        async with semaphore:
+            return await executor_async(**request_kwargs)
+
+    # A failed request is returned as its SyllabusGeneratorError instead of cancelling the batch
+    return await asyncio.gather(*[run(request_kwargs) for request_kwargs in requests], return_exceptions=True)
@@ -18,6 +18,8 @@ from langchain_core.messages import HumanMessage
 from app.services.logger import setup_logger
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from functools import lru_cache
+
 import os
 import tempfile
 import uuid
@@ -421,7 +423,10 @@ file_loader_map = {
     FileType.GPDF: load_gpdf_documents
 }
 
-llm_for_img = ChatGoogleGenerativeAI(model="gemini-1.5-flash")
+@lru_cache(maxsize=1)
+def get_llm_for_img():
+    # Built on first use instead of at import time
+    return ChatGoogleGenerativeAI(model="gemini-1.5-flash")
 
 def generate_summary_from_img(img_url):
     message = HumanMessage(
@@ -435,7 +440,7 @@ def generate_summary_from_img(img_url):
     )
 
     try:
-        response = llm_for_img.invoke([message]).content
+        response = get_llm_for_img().invoke([message]).content
         logger.info(f"Generated summary: {response}")
     except Exception as e:
         logger.error(f"Error processing the request due to Invalid Content or Invalid Image URL")
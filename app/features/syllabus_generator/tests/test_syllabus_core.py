@@ -1,5 +1,9 @@
+import asyncio
+import threading
+import time
 import pytest
-from app.features.syllabus_generator.core import executor
+from app.features.syllabus_generator import core, tools
+from app.features.syllabus_generator.core import executor, executor_async, batch_executor_async
 from app.api.error_utilities import SyllabusGeneratorError
 from app.services.schemas import SyllabusGeneratorArgsModel
 
@@ -525,4 +529,169 @@ def test_executor_gpdfs_url_invalid():
     with pytest.raises(SyllabusGeneratorError) as exc_info:
         syllabus = executor(syllabus_generator_args)
 
-    assert isinstance(exc_info.value, SyllabusGeneratorError)
\ No newline at end of file
+    assert isinstance(exc_info.value, SyllabusGeneratorError)
+
+class FakeSyllabusChain:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def invoke(self, inputs):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+        return {"course": inputs["course"], "summary": inputs["summary"]}
+
+class FakeSyllabusPipeline:
+    def __init__(self, chain):
+        self.chain = chain
+
+    def __call__(self, verbose=False):
+        return self
+
+    def compile(self):
+        return self.chain
+
+@pytest.fixture
+def fake_syllabus_chain(monkeypatch, tmp_path):
+    def fake_get_file_summary(file_url, file_type, verbose=True):
+        if "dummy" in file_url:
+            raise ValueError(f"Could not load {file_url}")
+        return f"Summary of {file_url}"
+
+    chain = FakeSyllabusChain()
+    monkeypatch.setattr(core, "SUMMARY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(core, "get_file_summary", fake_get_file_summary)
+    monkeypatch.setattr(tools, "SyllabusGeneratorPipeline", FakeSyllabusPipeline(chain))
+    core.get_summary_cache.cache_clear()
+    yield chain
+    core.get_summary_cache.cache_clear()
+
+def build_request(course, file_url="https://filesamples.com/samples/document/pdf/sample1.pdf"):
+    return {
+        "grade_level": "college",
+        "course": course,
+        "instructor_name": "Radical AI",
+        "instructor_title": "PhD in CS",
+        "unit_time": "week",
+        "unit_time_value": 8,
+        "start_date": "July, 4th, 2024",
+        "assessment_methods": "project and exams",
+        "grading_scale": "In percentages (100%)",
+        "file_url": file_url,
+        "file_type": "pdf",
+        "lang": "en",
+        "verbose": False
+    }
+
+def test_executor_async_valid(fake_syllabus_chain):
+    syllabus = asyncio.run(executor_async(**build_request("Advanced Data Structures")))
+
+    assert syllabus == {
+        "course": "Advanced Data Structures",
+        "summary": "Summary of https://filesamples.com/samples/document/pdf/sample1.pdf"
+    }
+
+def test_executor_async_invalid(fake_syllabus_chain):
+    request = build_request("Advanced Data Structures", "https://filesamples.com/samples/document/pdf/dummy.pdf")
+
+    with pytest.raises(SyllabusGeneratorError):
+        asyncio.run(executor_async(**request))
+
+def test_batch_executor_async_bounds_concurrency(fake_syllabus_chain):
+    requests = [build_request(f"Course {i}") for i in range(6)]
+
+    syllabi = asyncio.run(batch_executor_async(requests, max_concurrency=2))
+
+    assert [syllabus["course"] for syllabus in syllabi] == [f"Course {i}" for i in range(6)]
+    assert fake_syllabus_chain.max_running == 2
+
+def test_batch_executor_async_returns_errors_in_place(fake_syllabus_chain):
+    requests = [
+        build_request("Course 0"),
+        build_request("Course 1", "https://filesamples.com/samples/document/pdf/dummy.pdf"),
+        build_request("Course 2")
+    ]
+
+    syllabi = asyncio.run(batch_executor_async(requests))
+
+    assert syllabi[0]["course"] == "Course 0"
+    assert isinstance(syllabi[1], SyllabusGeneratorError)
+    assert syllabi[2]["course"] == "Course 2"
+
+@pytest.fixture
+def summary_cache(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_get_file_summary(file_url, file_type, verbose=True):
+        calls.append(file_url)
+        return "" if "empty" in file_url else f"Summary of {file_url}"
+
+    get_summary_cache = core.get_summary_cache
+    monkeypatch.setattr(core, "SUMMARY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(core, "get_file_summary", fake_get_file_summary)
+    get_summary_cache.cache_clear()
+    yield calls
+    get_summary_cache.cache_clear()
+
+def test_get_cached_file_summary_hit(summary_cache):
+    file_url = "https://filesamples.com/samples/document/pdf/sample1.pdf"
+
+    first = core.get_cached_file_summary(file_url, "pdf", "en", verbose=False)
+    second = core.get_cached_file_summary(file_url, "pdf", "en", verbose=False)
+
+    assert first == second == f"Summary of {file_url}"
+    assert summary_cache == [file_url]
+
+def test_get_cached_file_summary_keyed_by_lang(summary_cache):
+    file_url = "https://filesamples.com/samples/document/pdf/sample1.pdf"
+
+    core.get_cached_file_summary(file_url, "pdf", "en", verbose=False)
+    core.get_cached_file_summary(file_url, "pdf", "es", verbose=False)
+
+    assert summary_cache == [file_url, file_url]
+
+def test_get_cached_file_summary_skips_empty(summary_cache):
+    file_url = "https://filesamples.com/samples/document/pdf/empty.pdf"
+
+    assert core.get_cached_file_summary(file_url, "pdf", "en", verbose=False) == ""
+    assert core.get_cached_file_summary(file_url, "pdf", "en", verbose=False) == ""
+
+    assert summary_cache == [file_url, file_url]
+
+def test_get_cached_file_summary_skips_live_documents(summary_cache):
+    file_url = "https://docs.google.com/document/d/1abc/edit"
+
+    core.get_cached_file_summary(file_url, "gdoc", "en", verbose=False)
+    core.get_cached_file_summary(file_url, "gdoc", "en", verbose=False)
+
+    assert summary_cache == [file_url, file_url]
+
+def test_get_cached_file_summary_unavailable_cache(summary_cache, monkeypatch):
+    file_url = "https://filesamples.com/samples/document/pdf/sample1.pdf"
+
+    def broken_cache():
+        raise OSError("Read-only file system")
+
+    monkeypatch.setattr(core, "get_summary_cache", broken_cache)
+
+    assert core.get_cached_file_summary(file_url, "pdf", "en", verbose=False) == f"Summary of {file_url}"
+    assert summary_cache == [file_url]
+
+def test_get_cached_file_summary_failed_write(summary_cache, monkeypatch):
+    file_url = "https://filesamples.com/samples/document/pdf/sample1.pdf"
+
+    class FullCache:
+        def get(self, key):
+            return None
+
+        def set(self, key, value, expire=None):
+            raise OSError("No space left on device")
+
+    monkeypatch.setattr(core, "get_summary_cache", lambda: FullCache())
+
+    assert core.get_cached_file_summary(file_url, "pdf", "en", verbose=False) == f"Summary of {file_url}"
@@ -1,18 +1,33 @@
 from langchain_core.pydantic_v1 import BaseModel, Field
 from typing import List
+from functools import lru_cache
 from app.services.logger import setup_logger
 
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_google_genai import GoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
 from app.features.syllabus_generator.document_loaders import read_text_file
 from app.services.schemas import SyllabusGeneratorArgsModel
+from app.services.prompts import build_prompt_template, get_format_instructions
 
 from fastapi import HTTPException
 
 
 logger = setup_logger(__name__)
 
+# Variables filled in the prompt template on every request
+PROMPT_INPUT_VARIABLES = (
+    "grade_level",
+    "course",
+    "instructor_name",
+    "instructor_title",
+    "unit_time",
+    "unit_time_value",
+    "start_date",
+    "assessment_methods",
+    "grading_scale",
+    "summary"
+)
+
 class SyllabusRequestArgs:
     def __init__(self, 
                  syllabus_generator_args: SyllabusGeneratorArgsModel,
@@ -90,10 +105,14 @@ class SyllabusRequestArgs:
         }
     
 
+@lru_cache(maxsize=1)
+def get_default_prompt() -> str:
+    return read_text_file("prompt/syllabus_generator-prompt.txt")
+
 class SyllabusGeneratorPipeline:
     def __init__(self, prompt=None, parser=None, model=None, verbose=False):
         default_config = {
-            "prompt": read_text_file("prompt/syllabus_generator-prompt.txt"),
+            "prompt": get_default_prompt(),
             "parser": JsonOutputParser(pydantic_object=SyllabusSchema),
             "model": GoogleGenerativeAI(model="gemini-1.5-pro")
         }
@@ -104,22 +123,7 @@ class SyllabusGeneratorPipeline:
 
     def compile(self):
         try:
-            prompt = PromptTemplate(
-                template=self.prompt,
-                input_variables=[
-                    "grade_level", 
-                    "course",
-                    "instructor_name",
-                    "instructor_title",
-                    "unit_time",
-                    "unit_time_value",
-                    "start_date",
-                    "assessment_methods",
-                    "grading_scale",
-                    "summary"
-                    ],
-                partial_variables={"format_instructions": self.parser.get_format_instructions()}
-            )
+            prompt = build_prompt_template(self.prompt, PROMPT_INPUT_VARIABLES, get_format_instructions(self.parser))
 
             chain = prompt | self.model | self.parser
 
@@ -343,4 +347,4 @@ def generate_syllabus(request_args, verbose=True):
         logger.error(f"Failed to generate syllabus: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate syllabus from LLM")
 
-    return output
\ No newline at end of file
+    return output
@@ -1,7 +1,11 @@
+import json
 import pytest
-from app.features.worksheet_generator.tools import worksheet_generator, generate_course_type
+from app.features.worksheet_generator import tools
+from app.features.worksheet_generator.tools import worksheet_generator, generate_course_type, CourseTypeCache, WorksheetGenerator
 from app.services.schemas import WorksheetQuestionModel
 from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake import FakeListLLM
 
 def test_generate_course_type_valid():
    course_type = generate_course_type("Multivariable Calculus")
@@ -55,4 +59,79 @@ def test_worksheet_generator_invalid_document():
     with pytest.raises(ValueError) as exc_info:
         worksheet = worksheet_generator('Mathematics', "College", worksheet_list, docs, "en", False)
    
-    assert isinstance(exc_info.value, ValueError)
\ No newline at end of file
+    assert isinstance(exc_info.value, ValueError)
+
+def test_course_type_cache_normalizes_topic():
+    cache = CourseTypeCache()
+    cache.insert("Multivariable Calculus", {"course_type": "Mathematics"})
+
+    assert cache.lookup("  multivariable   CALCULUS ") == {"course_type": "Mathematics"}
+    assert cache.lookup("Calculus") is None
+
+def test_course_type_cache_evicts_least_recently_used():
+    cache = CourseTypeCache(capacity=2)
+    cache.insert("Biology", {"course_type": "Sciences"})
+    cache.insert("History", {"course_type": "Individuals and Societies"})
+    cache.lookup("Biology")
+    cache.insert("Painting", {"course_type": "Arts"})
+
+    assert cache.lookup("History") is None
+    assert cache.lookup("Biology") == {"course_type": "Sciences"}
+    assert cache.lookup("Painting") == {"course_type": "Arts"}
+
+def test_course_type_cache_returns_copies():
+    cache = CourseTypeCache()
+    response = {"course_type": "Sciences"}
+    cache.insert("Biology", response)
+    response["course_type"] = "Arts"
+
+    cached = cache.lookup("Biology")
+    cached["course_type"] = "Mathematics"
+
+    assert cache.lookup("Biology") == {"course_type": "Sciences"}
+
+class CountingLLM(FakeListLLM):
+    calls: list = []
+
+    def _call(self, *args, **kwargs):
+        self.calls.append(1)
+        return super()._call(*args, **kwargs)
+
+@pytest.fixture
+def fake_worksheet_model(monkeypatch):
+    # The default Gemini model and embeddings are still constructed, but never called
+    monkeypatch.setenv("GOOGLE_API_KEY", "fake")
+
+    def build_worksheet_generator(responses):
+        model = CountingLLM(responses=responses)
+        monkeypatch.setattr(
+            tools,
+            "WorksheetGenerator",
+            lambda **kwargs: WorksheetGenerator(model=model, embedding_model=DeterministicFakeEmbedding(size=16), **kwargs)
+        )
+        return model
+
+    return build_worksheet_generator
+
+def run_true_false_worksheet(number):
+    worksheet_list = WorksheetQuestionModel(worksheet_question_list=[{"question_type": "true_false", "number": number}])
+    documents = [Document(page_content="The Eiffel Tower is located in Paris.")]
+    return worksheet_generator("Sciences", "college", worksheet_list, documents, "en", False)
+
+def test_worksheet_generator_retries_null_result(fake_worksheet_model):
+    question = {"question": "The Eiffel Tower is in Paris.", "answer": True, "explanation": "It is in Paris."}
+    model = fake_worksheet_model(["null", json.dumps(question), json.dumps(question)])
+
+    results = run_true_false_worksheet(1)
+
+    assert results == {"true_false": [question]}
+    # The None result used up the first of two attempts
+    assert len(model.calls) == 2
+
+def test_worksheet_generator_stops_at_max_attempts(fake_worksheet_model):
+    model = fake_worksheet_model(["null"])
+
+    results = run_true_false_worksheet(1)
+
+    assert results == {"true_false": []}
+    assert len(model.calls) == 5
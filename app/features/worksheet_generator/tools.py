@@ -5,13 +5,15 @@ import os
 from langchain_core.prompts import PromptTemplate
 from langchain_core.pydantic_v1 import BaseModel, Field
 from typing import List
+from collections import OrderedDict
 from langchain_core.runnables import RunnablePassthrough, RunnableParallel
-from langchain_chroma import Chroma
 from langchain_core.documents import Document
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
 from fastapi import HTTPException
 
+from app.services.vectorstore import QuantizedVectorStore
+
 
 logger = setup_logger()
 
@@ -80,7 +82,7 @@ class WorksheetGenerator(BaseGenerator):
             "model": GoogleGenerativeAI(model="gemini-1.5-pro"),
             "parser": self.get_parser_for_question_type(),
             "prompt": read_text_file("prompts/generate-worksheet-prompt.txt"),
-            "vectorstore_class": Chroma,
+            "vectorstore_class": QuantizedVectorStore,
             "embedding_model": GoogleGenerativeAIEmbeddings(model='models/embedding-001')
         }
 
@@ -133,9 +135,15 @@ class WorksheetGenerator(BaseGenerator):
         return chain
 
     def validate_result(self, result):
+        # Cheap shape check before building the schema
+        if not isinstance(result, dict):
+            logger.warning(f"Invalid question format: expected a JSON object") if self.verbose else None
+            return False
+
         try:
             logger.info(f"Validating question format") if self.verbose else None
-            schema = self.get_parser_for_question_type().pydantic_object
+            # The parser is already set up for the current question type in compile()
+            schema = self.parser.pydantic_object
             schema(**result)
             return True
         except Exception as e:
@@ -162,11 +170,7 @@ def worksheet_generator(course_type, grade_level, worksheet_list, documents, lan
             """
             result = chain.invoke(attribute_collection)
 
-            if result is None:
-                logger.warning("No question generated. Attempting again.") if verbose else None
-                continue
-
-            if "model_config" in result:
+            if isinstance(result, dict) and "model_config" in result:
                 del result["model_config"]
 
             if worksheet_generator.validate_result(result):
@@ -180,9 +184,6 @@ def worksheet_generator(course_type, grade_level, worksheet_list, documents, lan
         results[worksheet.question_type] = generated_questions
         generated_questions = []
         previous_questions = []
-
-    if verbose: logger.info(f"Deleting vectorstore")
-    worksheet_generator.vectorstore.delete_collection()
     return results
  
 class CourseTypeSchema(BaseModel):
@@ -195,7 +196,38 @@ class CourseTypeSchema(BaseModel):
     - Arts
     """)
 
+class CourseTypeCache:
+    """In-process LRU cache of course type classifications keyed by the normalized topic."""
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def make_key(topic: str) -> str:
+        return " ".join(str(topic).lower().split())
+
+    def lookup(self, topic: str):
+        key = self.make_key(topic)
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return dict(self._entries[key])
+
+    def insert(self, topic: str, response: dict):
+        key = self.make_key(topic)
+        self._entries[key] = dict(response)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+course_type_cache = CourseTypeCache()
+
 def generate_course_type(topic: str=None, verbose: bool=False):
+    cached = course_type_cache.lookup(topic)
+    if cached is not None:
+        logger.info(f"Course type cache hit for topic: {topic}") if verbose else None
+        return cached
+
     try:
         course_type_generator = CourseTypeGenerator(verbose=verbose)
         chain = course_type_generator.compile()
@@ -204,6 +236,9 @@ def generate_course_type(topic: str=None, verbose: bool=False):
         logger.error(f"Failed to generate Worksheet: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate course type from LLM")
 
+    if isinstance(output, dict) and output.get("course_type"):
+        course_type_cache.insert(topic, output)
+
     return output
 
 #Fill-in-the-blank question type
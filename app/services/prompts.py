@@ -0,0 +1,24 @@
+from functools import lru_cache
+
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.prompts import PromptTemplate
+
+@lru_cache(maxsize=32)
+def get_schema_format_instructions(pydantic_object) -> str:
+    # The format instructions only depend on the schema, so build them once per schema
+    return JsonOutputParser(pydantic_object=pydantic_object).get_format_instructions()
+
+def get_format_instructions(parser) -> str:
+    pydantic_object = getattr(parser, "pydantic_object", None)
+    if pydantic_object is None:
+        return parser.get_format_instructions()
+    return get_schema_format_instructions(pydantic_object)
+
+@lru_cache(maxsize=32)
+def build_prompt_template(prompt: str, input_variables: tuple, format_instructions: str) -> PromptTemplate:
+    # Identical for every request with the same prompt and schema, so share the template
+    return PromptTemplate(
+        template=prompt,
+        input_variables=list(input_variables),
+        partial_variables={"format_instructions": format_instructions}
+    )
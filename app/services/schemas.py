@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Any
 from enum import Enum
 from app.services.tool_registry import BaseTool
@@ -56,7 +56,7 @@ class ChatMessage(BaseModel):
 
 class QuizzifyArgs(BaseModel):
     topic: str
-    n_questions: int
+    n_questions: int = Field(ge=1, le=10)
     file_url: str
     file_type: str
     lang: Optional[str] = "en"
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+from app.services.vectorstore import QuantizedVectorStore, cosine_scores, dequantize, quantize, top_k
+
+class KeywordEmbeddings(Embeddings):
+    # Deterministic embeddings: one dimension per keyword
+    keywords = ["cell", "energy", "france", "paris"]
+
+    def embed_query(self, text):
+        return [float(text.lower().count(keyword)) + 0.01 for keyword in self.keywords]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+@pytest.fixture
+def vectorstore():
+    store = QuantizedVectorStore(embedding_function=KeywordEmbeddings())
+    store.add_texts(
+        ["The cell makes energy", "Paris is in France", "France and Paris"],
+        ids=["bio", "geo-1", "geo-2"]
+    )
+    return store
+
+def test_quantize_round_trip():
+    vectors = np.random.default_rng(0).normal(size=(5, 768)).astype(np.float32)
+    quantized, scales = quantize(vectors)
+
+    assert quantized.dtype == np.int8
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    assert np.allclose(dequantize(quantized, scales), unit, atol=0.01)
+
+def test_add_skips_existing_ids(vectorstore):
+    vectorstore.add_texts(["The cell makes energy"], ids=["bio"])
+
+    assert len(vectorstore) == 3
+    assert [doc.id for doc in vectorstore.get_by_ids(["bio", "missing"])] == ["bio"]
+
+def test_similarity_search(vectorstore):
+    docs = vectorstore.similarity_search("energy in the cell", k=1)
+
+    assert docs[0].page_content == "The cell makes energy"
+
+def test_similarity_search_restricted_to_ids(vectorstore):
+    docs = vectorstore.similarity_search("energy in the cell", k=3, ids=["geo-1", "geo-2"])
+
+    assert len(docs) == 2
+    assert all("France" in doc.page_content for doc in docs)
+
+def test_max_marginal_relevance_search(vectorstore):
+    docs = vectorstore.max_marginal_relevance_search("Paris, France", k=2, fetch_k=3, lambda_mult=0.1)
+
+    assert len(docs) == 2
+    assert "The cell makes energy" in [doc.page_content for doc in docs]
+
+def test_cosine_scores_match_dequantized_vectors():
+    rng = np.random.default_rng(1)
+    quantized, scales = quantize(rng.normal(size=(10, 32)))
+    query = rng.normal(size=32).astype(np.float32)
+
+    expected = dequantize(quantized, scales) @ query
+    assert np.allclose(cosine_scores(quantized, scales, query), expected, atol=1e-4)
+
+def test_top_k_is_sorted():
+    scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+
+    assert list(top_k(scores, 2)) == [1, 3]
+    assert list(top_k(scores, 10)) == [1, 3, 2, 0]
+
+def test_from_texts_requires_texts():
+    with pytest.raises(ValueError):
+        QuantizedVectorStore.from_texts([], KeywordEmbeddings())
+
+def test_max_size_evicts_least_recently_used():
+    store = QuantizedVectorStore(embedding_function=KeywordEmbeddings(), max_size=2)
+    store.add_texts(["cell", "energy"], ids=["a", "b"])
+    store.get_by_ids(["a"])
+    store.add_texts(["paris"], ids=["a"])
+    store.add_texts(["france"], ids=["c"])
+
+    assert len(store) == 2
+    assert [doc.id for doc in store.get_by_ids(["a", "b", "c"])] == ["a", "c"]
+
+def test_ttl_expires_unused_ids(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.vectorstore.time.monotonic", lambda: now[0])
+    store = QuantizedVectorStore(embedding_function=KeywordEmbeddings(), ttl=60)
+    store.add_texts(["cell", "energy"], ids=["a", "b"])
+
+    now[0] += 30
+    store.similarity_search("cell", k=1, ids=["a"])
+    now[0] += 45
+
+    assert [doc.id for doc in store.get_by_ids(["a", "b"])] == ["a"]
+    assert store._documents.count(None) == 1
+
+def test_evicted_rows_are_reused():
+    store = QuantizedVectorStore(embedding_function=KeywordEmbeddings(), max_size=3)
+    for i in range(1000):
+        store.add_texts([f"cell {i}"], ids=[str(i)])
+
+    assert len(store) == 3
+    assert len(store._documents) == 3
+    assert [doc.id for doc in store.get_by_ids(["0", "997", "998", "999"])] == ["997", "998", "999"]
+
+def test_growth_keeps_all_rows():
+    store = QuantizedVectorStore(embedding_function=KeywordEmbeddings())
+    texts = ["paris" if i == 700 else "cell" for i in range(1000)]
+    store.add_texts(texts, ids=[str(i) for i in range(1000)])
+
+    assert len(store) == 1000
+    assert store.similarity_search("paris", k=1)[0].id == "700"
+
+def test_delete():
+    store = QuantizedVectorStore(embedding_function=KeywordEmbeddings())
+    store.add_texts(["cell", "paris"], ids=["a", "b"])
+    store.delete(["a"])
+
+    assert [doc.id for doc in store.get_by_ids(["a", "b"])] == ["b"]
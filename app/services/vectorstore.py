@@ -0,0 +1,291 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+import time
+import uuid
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# Rows allocated on the first insert; the matrix doubles whenever it is full
+INITIAL_CAPACITY = 256
+
+# Rows scored per matrix-vector product, bounding the float32 temporary to SCORE_BLOCK_SIZE x dims
+SCORE_BLOCK_SIZE = 4096
+
+def quantize(vectors) -> Tuple[np.ndarray, np.ndarray]:
+    # Normalize each row so dot products are cosine similarities, then scale it into int8
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
+
+    max_abs = np.abs(vectors).max(axis=1)
+    scales = (127 / np.where(max_abs == 0, 1, max_abs)).astype(np.float32)
+    quantized = np.clip(np.round(vectors * scales[:, None]), -128, 127).astype(np.int8)
+
+    return quantized, scales
+
+def dequantize(quantized: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return quantized.astype(np.float32) / scales[:, None]
+
+def cosine_scores(quantized: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    # Dequantizing a row divides it by its scale, so scale the dot products instead of the matrix
+    scores = np.empty(len(quantized), dtype=np.float32)
+    for start in range(0, len(quantized), SCORE_BLOCK_SIZE):
+        block = quantized[start:start + SCORE_BLOCK_SIZE]
+        scores[start:start + SCORE_BLOCK_SIZE] = block.astype(np.float32) @ query
+    return scores / scales
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # Partial selection of the k best scores, sorting only those
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates])]
+
+def maximal_marginal_relevance(query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    relevance = candidates @ query
+    selected = [int(np.argmax(relevance))]
+
+    while len(selected) < min(k, len(candidates)):
+        redundancy = (candidates @ candidates[selected].T).max(axis=1)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        selected.append(int(np.argmax(scores)))
+
+    return selected
+
+class QuantizedVectorStore(VectorStore):
+    """In-process vector store keeping int8-quantized embeddings, a quarter of the memory of float32.
+
+    With max_size set, the least recently used ids are evicted to make room for new ones.
+    With ttl set, ids not added, looked up or searched for ttl seconds expire.
+    """
+
+    def __init__(self,
+                 embedding_function: Embeddings,
+                 collection_name: str = "default",
+                 max_size: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        self.embedding_function = embedding_function
+        self.collection_name = collection_name
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        # id -> matrix row, least recently used first
+        self._rows: "OrderedDict[str, int]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._documents: List[Optional[Document]] = []
+        self._free_rows: List[int] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._scales = np.empty(0, dtype=np.float32)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_function
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _touch(self, doc_id: str, now: float):
+        self._rows.move_to_end(doc_id)
+        self._last_used[doc_id] = now
+
+    def _remove(self, doc_id: str):
+        row = self._rows.pop(doc_id)
+        del self._last_used[doc_id]
+        self._documents[row] = None
+        self._free_rows.append(row)
+
+    def _evict(self, now: float, reserve: int = 0):
+        # Expired and least recently used ids are both at the front of the LRU order
+        while self._rows:
+            doc_id = next(iter(self._rows))
+            expired = self.ttl is not None and now - self._last_used[doc_id] > self.ttl
+            full = self.max_size is not None and len(self._rows) + reserve > self.max_size
+            if not (expired or full):
+                break
+            self._remove(doc_id)
+
+    def _allocate_row(self, dims: int) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        row = len(self._documents)
+        if self._vectors is None:
+            self._vectors = np.empty((INITIAL_CAPACITY, dims), dtype=np.int8)
+            self._scales = np.empty(INITIAL_CAPACITY, dtype=np.float32)
+        elif row == len(self._vectors):
+            # Doubling keeps the total copying of the matrix linear in the number of inserts
+            self._vectors = np.concatenate([self._vectors, np.empty_like(self._vectors)])
+            self._scales = np.concatenate([self._scales, np.empty_like(self._scales)])
+
+        self._documents.append(None)
+        return row
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+
+            documents = []
+            for doc_id in ids:
+                if doc_id in self._rows:
+                    self._touch(doc_id, now)
+                    documents.append(self._documents[self._rows[doc_id]])
+            return documents
+
+    def add_embeddings(self,
+                       texts: Iterable[str],
+                       embeddings: List[List[float]],
+                       metadatas: Optional[List[dict]] = None,
+                       ids: Optional[List[str]] = None) -> List[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+
+        with self._lock:
+            now = time.monotonic()
+
+            # Refresh ids that are already stored, and skip ids repeated in this call
+            new_positions, seen = [], set()
+            for position, doc_id in enumerate(ids):
+                if doc_id in self._rows:
+                    self._touch(doc_id, now)
+                elif doc_id not in seen:
+                    new_positions.append(position)
+                    seen.add(doc_id)
+
+            self._evict(now, reserve=len(new_positions))
+
+            if not new_positions:
+                return ids
+
+            quantized, scales = quantize([embeddings[position] for position in new_positions])
+
+            for position, vector, scale in zip(new_positions, quantized, scales):
+                row = self._allocate_row(quantized.shape[1])
+                self._vectors[row], self._scales[row] = vector, scale
+
+                doc_id = ids[position]
+                self._documents[row] = Document(id=doc_id, page_content=texts[position], metadata=metadatas[position])
+                self._rows[doc_id] = row
+                self._last_used[doc_id] = now
+
+        return ids
+
+    def add_texts(self,
+                  texts: Iterable[str],
+                  metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None,
+                  **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(texts, self.embedding_function.embed_documents(texts), metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        with self._lock:
+            for doc_id in ids or list(self._rows):
+                if doc_id in self._rows:
+                    self._remove(doc_id)
+        return True
+
+    def _search(self, embedding: List[float], k: int, ids: Optional[List[str]]) -> Tuple[List[Document], np.ndarray, np.ndarray]:
+        """Returns the top-k (documents, scores, dequantized vectors), optionally restricted to the given ids."""
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+
+        with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+
+            if ids is None:
+                doc_ids = list(self._rows)
+            else:
+                doc_ids = [doc_id for doc_id in ids if doc_id in self._rows]
+                for doc_id in doc_ids:
+                    self._touch(doc_id, now)
+
+            if not doc_ids:
+                return [], np.empty(0, dtype=np.float32), np.empty((0, 0), dtype=np.float32)
+
+            # Indexing copies the rows, so scoring can run outside the lock
+            rows = np.array([self._rows[doc_id] for doc_id in doc_ids], dtype=np.int64)
+            vectors, scales = self._vectors[rows], self._scales[rows]
+            documents = [self._documents[row] for row in rows]
+
+        scores = cosine_scores(vectors, scales, query)
+        order = top_k(scores, k)
+
+        # Only the selected rows are dequantized
+        return [documents[i] for i in order], scores[order], dequantize(vectors[order], scales[order])
+
+    def similarity_search_with_score_by_vector(self,
+                                               embedding: List[float],
+                                               k: int = 4,
+                                               ids: Optional[List[str]] = None,
+                                               **kwargs: Any) -> List[Tuple[Document, float]]:
+        documents, scores, _ = self._search(embedding, k, ids)
+        return [(doc, float(score)) for doc, score in zip(documents, scores)]
+
+    def similarity_search_by_vector(self,
+                                    embedding: List[float],
+                                    k: int = 4,
+                                    ids: Optional[List[str]] = None,
+                                    **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, ids)]
+
+    def similarity_search(self,
+                          query: str,
+                          k: int = 4,
+                          ids: Optional[List[str]] = None,
+                          **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding_function.embed_query(query), k, ids)
+
+    def max_marginal_relevance_search_by_vector(self,
+                                                embedding: List[float],
+                                                k: int = 4,
+                                                fetch_k: int = 20,
+                                                lambda_mult: float = 0.5,
+                                                ids: Optional[List[str]] = None,
+                                                **kwargs: Any) -> List[Document]:
+        documents, _, candidates = self._search(embedding, fetch_k, ids)
+        if not documents:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+        selected = maximal_marginal_relevance(query, candidates, k, lambda_mult)
+
+        return [documents[position] for position in selected]
+
+    def max_marginal_relevance_search(self,
+                                      query: str,
+                                      k: int = 4,
+                                      fetch_k: int = 20,
+                                      lambda_mult: float = 0.5,
+                                      ids: Optional[List[str]] = None,
+                                      **kwargs: Any) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self.embedding_function.embed_query(query), k, fetch_k, lambda_mult, ids
+        )
+
+    @classmethod
+    def from_texts(cls,
+                   texts: List[str],
+                   embedding: Embeddings,
+                   metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None,
+                   collection_name: str = "default",
+                   max_size: Optional[int] = None,
+                   ttl: Optional[float] = None,
+                   **kwargs: Any) -> "QuantizedVectorStore":
+        if not texts:
+            raise ValueError("Cannot create a vectorstore from an empty list of texts")
+
+        vectorstore = cls(embedding_function=embedding, collection_name=collection_name, max_size=max_size, ttl=ttl)
+        vectorstore.add_texts(texts, metadatas, ids)
+        return vectorstore